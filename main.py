@@ -10,66 +10,134 @@ This script orchestrates the full analysis pipeline:
 All output is logged to logs/timestamp.log
 """
 
+import codecs
 import subprocess
 import sys
+import logging
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
 from pathlib import Path
 from datetime import datetime
 import argparse
 
+# Import the scripts the same way they import each other when run directly,
+# so each module is only loaded once
+sys.path.insert(0, str(Path(__file__).parent / "scripts"))
+
+import dns_classify
+import dns_effective
+
+
+DATA_DIR = Path(__file__).parent / "data"
+OUTPUT_DIR = Path(__file__).parent / "output"
+
+
+class Tee:
+    """Write-through stream that sends output to several streams at once."""
+
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def write(self, data):
+        for stream in self.streams:
+            stream.write(data)
+        return len(data)
+
+    def flush(self):
+        for stream in self.streams:
+            stream.flush()
+
 
 def setup_logging():
-    """Create logs directory and setup log file."""
+    """Create logs directory and open a line-buffered log file for the whole run."""
     log_dir = Path(__file__).parent / "logs"
     log_dir.mkdir(exist_ok=True)
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_file = log_dir / f"{timestamp}.log"
     
-    return log_file
+    return open(log_file, "w", encoding="utf-8", buffering=1)
 
 
-def run_script(script_name, log_file, description):
-    """Run a Python script and log all output."""
+def log_header(log, description, **details):
+    """Print a stage banner to the console and write it to the log file."""
     print(f"\n{'='*60}")
     print(f"Running: {description}")
     print(f"{'='*60}\n")
     
+    lines = [f"Running: {description}"]
+    lines += [f"{key}: {value}" for key, value in details.items()]
+    lines.append(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    log.write(f"\n{'='*60}\n" + "\n".join(lines) + f"\n{'='*60}\n\n")
+
+
+def log_result(log, message):
+    """Print a message to the console and write it to the log file."""
+    print(message)
+    log.write(message + "\n")
+
+
+def run_script(script_name, log, description):
+    """Run a Python script and log all output."""
+    log_header(log, description, Script=script_name)
+    
     script_path = Path(__file__).parent / "scripts" / script_name
     
-    with open(log_file, "a", encoding="utf-8") as log:
-        log.write(f"\n{'='*60}\n")
-        log.write(f"Running: {description}\n")
-        log.write(f"Script: {script_name}\n")
-        log.write(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        log.write(f"{'='*60}\n\n")
-        
-        process = subprocess.Popen(
-            [sys.executable, str(script_path)],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            encoding="utf-8",
-            errors="replace"
-        )
-        
-        # Stream output to both console and log file
-        if process.stdout:
-            for line in process.stdout:
-                print(line, end="")
-                log.write(line)
-        
-        process.wait()
+    process = subprocess.Popen(
+        [sys.executable, str(script_path)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT
+    )
+    
+    # Stream output to both console and log file in blocks as it arrives
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    if process.stdout:
+        while chunk := process.stdout.read1(8192):
+            text = decoder.decode(chunk)
+            sys.stdout.write(text)
+            log.write(text)
         
-        if process.returncode != 0:
-            error_msg = f"\n❌ ERROR: Script failed with exit code {process.returncode}\n"
-            print(error_msg)
-            log.write(error_msg)
-            return False
-        else:
-            success_msg = f"\n✓ Script completed successfully\n"
-            print(success_msg)
-            log.write(success_msg)
-            return True
+        # Flush any bytes left over from a multi-byte character cut off at the end
+        tail = decoder.decode(b"", final=True)
+        sys.stdout.write(tail)
+        log.write(tail)
+    
+    process.wait()
+    
+    if process.returncode != 0:
+        log_result(log, f"\n❌ ERROR: Script failed with exit code {process.returncode}\n")
+        return False
+    
+    log_result(log, f"\n✓ Script completed successfully\n")
+    return True
+
+
+def run_stage(stage, log, description, *args):
+    """
+    Run a pipeline stage in-process and log all output.
+    Returns: (success, result)
+    """
+    log_header(log, description)
+    
+    # Send printed output and log records to both console and log file
+    log_handler = logging.StreamHandler(log)
+    log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logging.getLogger().addHandler(log_handler)
+    
+    try:
+        with redirect_stdout(Tee(sys.stdout, log)), redirect_stderr(Tee(sys.stderr, log)):
+            result = stage(*args)
+    except SystemExit as e:
+        log_result(log, f"\n❌ ERROR: Stage exited with code {e.code}\n")
+        return False, None
+    except Exception:
+        log_result(log, f"\n❌ ERROR: Stage failed\n{traceback.format_exc()}")
+        return False, None
+    finally:
+        logging.getLogger().removeHandler(log_handler)
+    
+    log_result(log, f"\n✓ Stage completed successfully\n")
+    return True, result
 
 
 def main():
@@ -91,31 +159,44 @@ def main():
         action="store_true",
         help="Only run classification on existing DNS data"
     )
+    parser.add_argument(
+        "--nameservers",
+        nargs="+",
+        metavar="IP",
+        help="DNS servers to query instead of the system resolver (e.g. 127.0.0.1 for a local Unbound)"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="Save intermediate classified data to the data folder"
+    )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Indent the final JSON output for readability"
+    )
     
     args = parser.parse_args()
     
     # Setup logging
-    log_file = setup_logging()
-    print(f"Logging to: {log_file}")
+    log = setup_logging()
+    print(f"Logging to: {log.name}")
     
     # Write header to log
-    with open(log_file, "w", encoding="utf-8") as log:
-        log.write(f"Icelandic Government Agency DNS Analysis\n")
-        log.write(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        log.write(f"Options: skip_scrape={args.skip_scrape}, skip_dns={args.skip_dns}, classify_only={args.classify_only}\n")
-        log.write(f"{'='*60}\n")
+    log.write(f"Icelandic Government Agency DNS Analysis\n")
+    log.write(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    log.write(f"Options: skip_scrape={args.skip_scrape}, skip_dns={args.skip_dns}, classify_only={args.classify_only}, nameservers={args.nameservers}, checkpoint={args.checkpoint}, pretty={args.pretty}\n")
+    log.write(f"{'='*60}\n")
     
     success = True
     
     # Step 1: Scrape island.is organizations
     if args.classify_only or args.skip_scrape:
-        print("\nSkipping island.is scrape (using existing data)")
-        with open(log_file, "a", encoding="utf-8") as log:
-            log.write("\nSkipping island.is scrape (using existing data)\n")
+        log_result(log, "\nSkipping island.is scrape (using existing data)")
     else:
         success = run_script(
             "scrape_island_is.py",
-            log_file,
+            log,
             "Step 1: Scraping island.is organizations"
         )
         if not success:
@@ -124,13 +205,15 @@ def main():
     
     # Step 2: DNS lookups
     if args.classify_only or args.skip_dns:
-        print("\nSkipping DNS lookups (using existing data)")
-        with open(log_file, "a", encoding="utf-8") as log:
-            log.write("\nSkipping DNS lookups (using existing data)\n")
+        log_result(log, "\nSkipping DNS lookups (using existing data)")
+        raw_path = None
     else:
-        success = run_script(
-            "dns_lookup.py",
-            log_file,
+        # Imported here so runs that skip DNS lookups don't need the DNS/WHOIS libraries
+        import dns_lookup
+        
+        success, raw_path = run_stage(
+            lambda: dns_lookup.run(dns_lookup.find_latest_input(DATA_DIR), DATA_DIR, args.nameservers),
+            log,
             "Step 2: Performing DNS lookups"
         )
         if not success:
@@ -138,9 +221,13 @@ def main():
             sys.exit(1)
     
     # Step 3: Classification and analysis
-    success = run_script(
-        "dns_classify.py",
-        log_file,
+    success, df = run_stage(
+        lambda: dns_classify.run(
+            dns_classify.read_input(raw_path or dns_classify.find_latest_input(DATA_DIR)),
+            DATA_DIR,
+            args.checkpoint
+        ),
+        log,
         "Step 3: Classifying and analyzing DNS data"
     )
     if not success:
@@ -148,10 +235,13 @@ def main():
         sys.exit(1)
     
     # Step 4: Effective provider determination
-    success = run_script(
-        "dns_effective.py",
-        log_file,
-        "Step 4: Determining effective providers"
+    success, df = run_stage(
+        dns_effective.run,
+        log,
+        "Step 4: Determining effective providers",
+        df,
+        OUTPUT_DIR,
+        args.pretty
     )
     if not success:
         print("\n❌ Pipeline failed at effective provider step")
@@ -161,14 +251,14 @@ def main():
     print(f"\n{'='*60}")
     print("✓ Pipeline completed successfully!")
     print(f"{'='*60}")
-    print(f"\nLog file: {log_file}")
+    print(f"\nLog file: {log.name}")
     print("Check the 'output' directory for final results.")
     
-    with open(log_file, "a", encoding="utf-8") as log:
-        log.write(f"\n{'='*60}\n")
-        log.write(f"Pipeline completed successfully!\n")
-        log.write(f"Ended: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        log.write(f"{'='*60}\n")
+    log.write(f"\n{'='*60}\n")
+    log.write(f"Pipeline completed successfully!\n")
+    log.write(f"Ended: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    log.write(f"{'='*60}\n")
+    log.close()
 
 
 if __name__ == "__main__":
@@ -1,265 +1,363 @@
+import numpy as np
 import pandas as pd
 import sys
 from pathlib import Path
 from datetime import datetime
 
 
-# ---------------------------------------------------------
-# Classification functions
-# ---------------------------------------------------------
-
-# Determine which email provider a domain uses (Microsoft, Google, Local, etc.)
-def classify_email_provider(mx: str, spf: str, mx_org: str = "", mx_country: str = "", spf_org: str = "", spf_country: str = "") -> str:
-    mx = str(mx) if pd.notna(mx) else ""
-    spf = str(spf) if pd.notna(spf) else ""
-    mx_org = str(mx_org) if pd.notna(mx_org) else ""
-    mx_country = str(mx_country) if pd.notna(mx_country) else ""
-    spf_org = str(spf_org) if pd.notna(spf_org) else ""
-    spf_country = str(spf_country) if pd.notna(spf_country) else ""
-    
-    # Prefer SPF org for classification (actual sending service)
-    org_l = spf_org.lower() if spf_org else mx_org.lower()
-    country_l = spf_country.lower() if spf_country else mx_country.lower()
-
-    # 1. Check SPF for major email providers first (most reliable for actual sending)
-    if "spf.protection.outlook.com" in spf.lower() or "microsoft" in spf_org.lower():
-        return "Microsoft 365"
-    
-    if "spf.google.com" in spf.lower() or "google" in spf_org.lower():
-        return "Google Workspace"
-
-    # 2. Check MX records for direct hosting (if no SPF cloud provider)
-    if "outlook.com" in mx.lower() or "office365" in mx.lower() or "microsoft" in mx_org.lower():
-        return "Microsoft 365"
-    
-    if "google" in mx.lower() or "google" in mx_org.lower():
-        return "Google Workspace"
-
-    # 3. Check if email is in Iceland (using MX or SPF country)
-    if country_l == "is" or ".is" in mx.lower():
-        return "Local (.is)"
-
-    # 4. Check if it's US-based email provider
-    if country_l == "us":
-        return "Other US"
-
-    # Check for no email configuration or explicit rejection
-    if not mx and (not spf or "v=spf1 -all" in spf.lower()):
-        return "Unknown"
-
-    return "Other"
+# Raw DNS columns that are filled with empty strings before classification
+STRING_COLS = [
+    "mx", "spf", "mx_asn", "mx_org", "mx_country",
+    "spf_asn", "spf_org", "spf_country",
+    "ns", "dns_asn", "dns_org", "dns_country",
+    "a", "hosting_asn", "hosting_org", "hosting_country",
+    "final_mx", "final_spf", "final_mx_asn", "final_mx_org", "final_mx_country",
+    "final_spf_asn", "final_spf_org", "final_spf_country",
+    "final_ns", "final_dns_asn", "final_dns_org", "final_dns_country",
+    "final_a", "final_hosting_asn", "final_hosting_org", "final_hosting_country",
+    "final_domain",
+]
+
+# Columns the classifiers read in lowercase (each is lowercased once per run).
+# The matching final_* columns are lowercased for redirected domains only.
+LOWERCASE_COLS = [
+    "mx", "spf", "mx_org", "mx_country", "spf_org", "spf_country",
+    "ns", "dns_org", "dns_country", "hosting_org", "hosting_country",
+]
+
+# Text columns are stored as Arrow-backed strings for fast vectorized string ops
+TEXT_DTYPE = "string[pyarrow]"
+
+# Categories an individual MX or SPF record can be classified into
+MX_SPF_CATEGORIES = ["Microsoft 365", "Google Workspace", "Local (.is)", "Other US", "Unknown", "Other"]
+
+# Columns holding classification results (a handful of distinct values each)
+CATEGORY_COLS = [
+    "email_provider", "mx_category", "spf_category",
+    "dns_category", "hosting_category",
+    "final_email_provider", "final_dns_category", "final_hosting_category",
+    "redirect_status",
+]
 
 
-# Categorize DNS provider (Cloudflare, AWS, Local Icelandic, etc.)
-def classify_dns_category(ns: str, dns_org: str = "", dns_country: str = "") -> str:
-    ns = str(ns) if pd.notna(ns) else ""
-    dns_org = str(dns_org) if pd.notna(dns_org) else ""
-    dns_country = str(dns_country) if pd.notna(dns_country) else ""
-    ns_l = ns.lower()
-    org_l = dns_org.lower()
-    country_l = dns_country.lower()
-
-    if not ns_l and not org_l and not country_l:
-        return "Unknown"
-
-    # 1. Check if DNS is hosted in Iceland
-    if country_l == "is":
-        return "Local (.is)"
+# ---------------------------------------------------------
+# Provider keywords
+# ---------------------------------------------------------
 
-    # 2. Check for major DNS providers
-    if "cloudflare" in org_l or "cloudflare.com" in ns_l:
-        return "Cloudflare"
+# Provider keywords looked for in each field: provider -> substrings (any of them counts)
+EMAIL_RECORD_KEYWORDS = {
+    "microsoft": ("outlook.com", "office365"),
+    "microsoft_spf": ("spf.protection.outlook.com",),
+    "google": ("google",),
+    "google_com": ("google.com",),
+    "google_spf": ("spf.google.com",),
+    "local": (".is",),
+    "reject": ("v=spf1 -all",),
+}
+NS_KEYWORDS = {
+    "cloudflare": ("cloudflare.com",),
+    "aws": ("awsdns",),
+    "azure": ("azure-dns",),
+}
+ORG_KEYWORDS = {
+    "microsoft": ("microsoft",),
+    "google": ("google",),
+    "aws": ("amazon", "aws"),
+    "azure": ("azure",),
+    "cloudflare": ("cloudflare",),
+    "digitalocean": ("digitalocean",),
+}
+
+
+# Find which provider keywords appear in each value (one boolean column per provider),
+# using plain substring matching on the lowercased column
+def match_providers(series_l: pd.Series, keywords: dict) -> dict:
+    hits = {}
+    for name, substrings in keywords.items():
+        hit = series_l.str.contains(substrings[0], regex=False)
+        for substring in substrings[1:]:
+            hit = hit | series_l.str.contains(substring, regex=False)
+        hits[name] = hit
+    return hits
 
-    if "amazon" in org_l or "aws" in org_l or "awsdns" in ns_l:
-        return "AWS"
 
-    if "microsoft" in org_l or "azure-dns" in ns_l or "azure" in org_l:
-        return "Azure"
+# ---------------------------------------------------------
+# Classification functions
+# ---------------------------------------------------------
 
-    if "google" in org_l:
-        return "Google"
+# np.select with the conditions as plain numpy booleans (Arrow string comparisons give
+# nullable boolean masks, which older pandas can't hand to np.select; missing counts as False)
+def select(conditions: list, choices, default) -> np.ndarray:
+    masks = [
+        c.to_numpy(dtype=bool, na_value=False) if isinstance(c, pd.Series) else c
+        for c in conditions
+    ]
+    return np.select(masks, choices, default=default)
+
+
+# Normalize a column to lowercase strings (missing values become empty strings)
+def lower_str(series: pd.Series) -> pd.Series:
+    return series.astype(TEXT_DTYPE).fillna("").str.lower()
+
+
+# Classify a single MX or SPF record to determine its category (used for disclaimers)
+def classify_mx_or_spf(record_l: pd.Series, record_hits: dict, org_l: pd.Series, org_hits: dict, country_l: pd.Series) -> pd.Categorical:
+    country_l = country_l.str.strip()
+
+    conditions = [
+        # Check for Microsoft
+        org_hits["microsoft"] | record_hits["microsoft"],
+        # Check for Google
+        org_hits["google"] | record_hits["google_com"],
+        # Check for Iceland
+        country_l.eq("is") | record_hits["local"],
+        # Check for US
+        country_l.eq("us"),
+        # Check if unknown
+        record_l.str.strip().eq("") & org_l.str.strip().eq(""),
+    ]
+    # Conditions are listed in MX_SPF_CATEGORIES order; anything else is "Other"
+    codes = select(conditions, np.arange(len(conditions)), default=len(conditions))
+    return pd.Categorical.from_codes(codes, categories=MX_SPF_CATEGORIES)
+
+
+# Determine which email provider each domain uses (Microsoft, Google, Local, etc.)
+# Also returns the categories of the MX and SPF records on their own, reusing the same matches
+# (all arguments are lowercased columns)
+def classify_email_provider(mx_l: pd.Series, spf_l: pd.Series, mx_org_l: pd.Series, mx_country_l: pd.Series, spf_org_l: pd.Series, spf_country_l: pd.Series) -> tuple:
+    # Prefer SPF country for classification (actual sending service)
+    country_l = spf_country_l.where(spf_country_l.ne(""), mx_country_l)
+
+    mx_hits = match_providers(mx_l, EMAIL_RECORD_KEYWORDS)
+    spf_hits = match_providers(spf_l, EMAIL_RECORD_KEYWORDS)
+    mx_org_hits = match_providers(mx_org_l, ORG_KEYWORDS)
+    spf_org_hits = match_providers(spf_org_l, ORG_KEYWORDS)
+
+    conditions = [
+        # 1. Check SPF for major email providers first (most reliable for actual sending)
+        spf_hits["microsoft_spf"] | spf_org_hits["microsoft"],
+        spf_hits["google_spf"] | spf_org_hits["google"],
+        # 2. Check MX records for direct hosting (if no SPF cloud provider)
+        mx_hits["microsoft"] | mx_org_hits["microsoft"],
+        mx_hits["google"] | mx_org_hits["google"],
+        # 3. Check if email is in Iceland (using MX or SPF country)
+        country_l.eq("is") | mx_hits["local"],
+        # 4. Check if it's US-based email provider
+        country_l.eq("us"),
+        # Check for no email configuration or explicit rejection
+        mx_l.eq("") & (spf_l.eq("") | spf_hits["reject"]),
+    ]
+    choices = [
+        "Microsoft 365",
+        "Google Workspace",
+        "Microsoft 365",
+        "Google Workspace",
+        "Local (.is)",
+        "Other US",
+        "Unknown",
+    ]
+    email_provider = select(conditions, choices, default="Other")
+    mx_category = classify_mx_or_spf(mx_l, mx_hits, mx_org_l, mx_org_hits, mx_country_l)
+    spf_category = classify_mx_or_spf(spf_l, spf_hits, spf_org_l, spf_org_hits, spf_country_l)
+
+    return email_provider, mx_category, spf_category
 
-    # 3. Check if it's US-based DNS provider
-    if country_l == "us":
-        return "Other US"
 
-    # 4. Legacy check for .is nameservers (backup)
-    if any(part.strip().endswith(".is") for part in ns_l.split(";")):
-        return "Local (.is)"
+# Categorize DNS provider (Cloudflare, AWS, Local Icelandic, etc.)
+# (all arguments are lowercased columns)
+def classify_dns_category(ns_l: pd.Series, org_l: pd.Series, country_l: pd.Series) -> np.ndarray:
+    ns_hits = match_providers(ns_l, NS_KEYWORDS)
+    org_hits = match_providers(org_l, ORG_KEYWORDS)
+
+    conditions = [
+        ns_l.eq("") & org_l.eq("") & country_l.eq(""),
+        # 1. Check if DNS is hosted in Iceland
+        country_l.eq("is"),
+        # 2. Check for major DNS providers
+        org_hits["cloudflare"] | ns_hits["cloudflare"],
+        org_hits["aws"] | ns_hits["aws"],
+        org_hits["microsoft"] | org_hits["azure"] | ns_hits["azure"],
+        org_hits["google"],
+        # 3. Check if it's US-based DNS provider
+        country_l.eq("us"),
+        # 4. Legacy check for .is nameservers (backup)
+        ns_l.str.contains(r"\.is\s*(?:;|$)"),
+    ]
+    choices = [
+        "Unknown",
+        "Local (.is)",
+        "Cloudflare",
+        "AWS",
+        "Azure",
+        "Google",
+        "Other US",
+        "Local (.is)",
+    ]
+    return select(conditions, choices, default="Other")
 
-    return "Other"
 
 # Categorize where the website is actually hosted based on ASN/organization data
-def classify_hosting_category(asn: str, org: str, country: str = "") -> str:
-    asn = str(asn) if pd.notna(asn) else ""
-    org = str(org) if pd.notna(org) else ""
-    country = str(country) if pd.notna(country) else ""
-    asn_l, org_l, country_l = asn.lower(), org.lower(), country.lower()
-
-    if not asn_l and not org_l and not country_l:
-        return "Unknown"
-
-    # 1. Check if hosted in Iceland
-    if country_l == "is":
-        return "Local (.is)"
-
-    # 2. Check for major cloud providers (the giants)
-    if "amazon" in org_l or "aws" in org_l:
-        return "AWS"
-
-    if "microsoft" in org_l or "azure" in org_l:
-        return "Azure"
-
-    if "google" in org_l:
-        return "Google"
-
-    if "cloudflare" in org_l:
-        return "Cloudflare"
-
-    if "digitalocean" in org_l:
-        return "DigitalOcean"
-
-    # 3. Check if it's US-based (other US tech companies)
-    if country_l == "us":
-        return "Other US"
-
+# (org and country are lowercased columns)
+def classify_hosting_category(asn: pd.Series, org_l: pd.Series, country_l: pd.Series) -> np.ndarray:
+    asn_l = lower_str(asn)
+
+    org_hits = match_providers(org_l, ORG_KEYWORDS)
+
+    conditions = [
+        asn_l.eq("") & org_l.eq("") & country_l.eq(""),
+        # 1. Check if hosted in Iceland
+        country_l.eq("is"),
+        # 2. Check for major cloud providers (the giants)
+        org_hits["aws"],
+        org_hits["microsoft"] | org_hits["azure"],
+        org_hits["google"],
+        org_hits["cloudflare"],
+        org_hits["digitalocean"],
+        # 3. Check if it's US-based (other US tech companies)
+        country_l.eq("us"),
+    ]
+    choices = [
+        "Unknown",
+        "Local (.is)",
+        "AWS",
+        "Azure",
+        "Google",
+        "Cloudflare",
+        "DigitalOcean",
+        "Other US",
+    ]
     # 4. Everything else
-    return "Other"
+    return select(conditions, choices, default="Other")
+
+
+# Classify how each domain redirects (none, internal, cross-border, etc.)
+def classify_redirect_status(redirect_count: pd.Series, domain: pd.Series, final_domain: pd.Series) -> np.ndarray:
+    domain = domain.astype(TEXT_DTYPE)
+    final_domain = final_domain.astype(TEXT_DTYPE)
+    domain_is = domain.str.endswith(".is")
+    final_domain_is = final_domain.str.endswith(".is")
+
+    conditions = [
+        redirect_count.eq(0) | final_domain.eq(""),
+        domain.eq(final_domain),
+        final_domain_is & domain_is,
+        domain_is & ~final_domain_is,
+    ]
+    choices = [
+        "No redirect",
+        "Internal redirect",
+        "Internal .is redirect",
+        "Cross-border redirect",
+    ]
+    return select(conditions, choices, default="External redirect")
 
 
 # ---------------------------------------------------------
 # Run classification
 # ---------------------------------------------------------
 
-# Get input file path
-data_dir = Path(__file__).parent.parent / "data"
-
-if len(sys.argv) > 1:
-    # Use file path provided as command line argument
-    input_path = Path(sys.argv[1])
-else:
-    # Find the most recent timestamped dns scan file in data folder
+# Find the most recent timestamped dns scan file in data folder
+def find_latest_input(data_dir: Path) -> Path:
     dns_files = sorted(data_dir.glob("dns_raw-*.csv"), reverse=True)
     if not dns_files:
         print("Error: No dns_raw-*.csv files found in data folder.")
         print("Run dns_lookup.py first to generate DNS data.")
         sys.exit(1)
-    input_path = dns_files[0]
-    print(f"Using most recent DNS data file: {input_path.name}")
-
-# Read the raw DNS data
-df = pd.read_csv(input_path)
-
-# Replace any missing values with empty strings
-df["mx"] = df["mx"].fillna("")
-df["spf"] = df["spf"].fillna("")
-df["mx_asn"] = df["mx_asn"].fillna("")
-df["mx_org"] = df["mx_org"].fillna("")
-df["mx_country"] = df["mx_country"].fillna("")
-df["spf_asn"] = df["spf_asn"].fillna("")
-df["spf_org"] = df["spf_org"].fillna("")
-df["spf_country"] = df["spf_country"].fillna("")
-df["ns"] = df["ns"].fillna("")
-df["dns_asn"] = df["dns_asn"].fillna("")
-df["dns_org"] = df["dns_org"].fillna("")
-df["dns_country"] = df["dns_country"].fillna("")
-df["a"] = df["a"].fillna("")
-df["hosting_asn"] = df["hosting_asn"].fillna("")
-df["hosting_org"] = df["hosting_org"].fillna("")
-df["hosting_country"] = df["hosting_country"].fillna("")
-df["final_mx"] = df["final_mx"].fillna("")
-df["final_spf"] = df["final_spf"].fillna("")
-df["final_mx_asn"] = df["final_mx_asn"].fillna("")
-df["final_mx_org"] = df["final_mx_org"].fillna("")
-df["final_mx_country"] = df["final_mx_country"].fillna("")
-df["final_spf_asn"] = df["final_spf_asn"].fillna("")
-df["final_spf_org"] = df["final_spf_org"].fillna("")
-df["final_spf_country"] = df["final_spf_country"].fillna("")
-df["final_ns"] = df["final_ns"].fillna("")
-df["final_dns_asn"] = df["final_dns_asn"].fillna("")
-df["final_dns_org"] = df["final_dns_org"].fillna("")
-df["final_dns_country"] = df["final_dns_country"].fillna("")
-df["final_a"] = df["final_a"].fillna("")
-df["final_hosting_asn"] = df["final_hosting_asn"].fillna("")
-df["final_hosting_org"] = df["final_hosting_org"].fillna("")
-df["final_hosting_country"] = df["final_hosting_country"].fillna("")
-df["final_domain"] = df["final_domain"].fillna("")
-df["redirect_count"] = df["redirect_count"].fillna(0)
-
-# Apply classifications
-print("\nClassifying DNS data...")
-df["email_provider"] = df.apply(
-    lambda row: classify_email_provider(row["mx"], row["spf"], row["mx_org"], row["mx_country"], row["spf_org"], row["spf_country"]),
-    axis=1,
-)
-df["dns_category"] = df.apply(
-    lambda row: classify_dns_category(row["ns"], row["dns_org"], row["dns_country"]),
-    axis=1,
-)
-df["hosting_category"] = df.apply(
-    lambda row: classify_hosting_category(row["hosting_asn"], row["hosting_org"], row["hosting_country"]),
-    axis=1,
-)
-
-# Classify final domain data (if redirect occurred)
-df["final_email_provider"] = df.apply(
-    lambda row: classify_email_provider(row["final_mx"], row["final_spf"], row["final_mx_org"], row["final_mx_country"], row["final_spf_org"], row["final_spf_country"]) if row.get("final_domain") and str(row.get("final_domain")).strip() else "",
-    axis=1,
-)
-df["final_dns_category"] = df.apply(
-    lambda row: classify_dns_category(row["final_ns"], row["final_dns_org"], row["final_dns_country"]) if row.get("final_domain") and str(row.get("final_domain")).strip() else "",
-    axis=1,
-)
-df["final_hosting_category"] = df.apply(
-    lambda row: classify_hosting_category(row["final_hosting_asn"], row["final_hosting_org"], row["final_hosting_country"]) if row.get("final_domain") and str(row.get("final_domain")).strip() else "",
-    axis=1,
-)
-
-# Add redirect status classification
-def classify_redirect_status(row):
-    redirect_count = row.get("redirect_count", 0)
-    domain = str(row.get("domain", ""))
-    final_domain = str(row.get("final_domain", ""))
-    
-    if redirect_count == 0 or not final_domain:
-        return "No redirect"
-    elif domain == final_domain:
-        return "Internal redirect"
-    elif final_domain.endswith(".is") and domain.endswith(".is"):
-        return "Internal .is redirect"
-    elif domain.endswith(".is") and not final_domain.endswith(".is"):
-        return "Cross-border redirect"
+    print(f"Using most recent DNS data file: {dns_files[0].name}")
+    return dns_files[0]
+
+
+# Read raw DNS data, loading the text columns directly as Arrow strings
+def read_input(input_path: Path) -> pd.DataFrame:
+    return pd.read_csv(
+        input_path,
+        engine="pyarrow",
+        dtype={col: TEXT_DTYPE for col in ["domain", *STRING_COLS]},
+    )
+
+
+# Classify raw DNS data, optionally saving a checkpoint to the data folder
+def run(df: pd.DataFrame, data_dir: Path, checkpoint: bool = True) -> pd.DataFrame:
+    # Replace any missing values with empty strings (and store numbers such as ASNs as text)
+    df[STRING_COLS] = df[STRING_COLS].astype(TEXT_DTYPE).fillna("")
+    df["redirect_count"] = df["redirect_count"].fillna(0).astype("int32")
+
+    # Lowercase the columns used by the classifiers once, and share them between classifiers
+    lc = {col: lower_str(df[col]) for col in LOWERCASE_COLS}
+
+    # Apply classifications
+    print("\nClassifying DNS data...")
+    df["email_provider"], df["mx_category"], df["spf_category"] = classify_email_provider(
+        lc["mx"], lc["spf"], lc["mx_org"], lc["mx_country"], lc["spf_org"], lc["spf_country"]
+    )
+    df["dns_category"] = classify_dns_category(lc["ns"], lc["dns_org"], lc["dns_country"])
+    df["hosting_category"] = classify_hosting_category(df["hosting_asn"], lc["hosting_org"], lc["hosting_country"])
+
+    # Classify final domain data, only for rows that redirect to another domain
+    has_final_domain = df["final_domain"].str.strip().ne("")
+    redirected = df.loc[has_final_domain]
+    final_lc = {col: lower_str(redirected[f"final_{col}"]) for col in LOWERCASE_COLS}
+
+    final_email_provider, _, _ = classify_email_provider(
+        final_lc["mx"], final_lc["spf"], final_lc["mx_org"], final_lc["mx_country"], final_lc["spf_org"], final_lc["spf_country"]
+    )
+    final_dns_category = classify_dns_category(final_lc["ns"], final_lc["dns_org"], final_lc["dns_country"])
+    final_hosting_category = classify_hosting_category(
+        redirected["final_hosting_asn"], final_lc["hosting_org"], final_lc["hosting_country"]
+    )
+
+    # Rows without a redirect get empty final categories
+    df["final_email_provider"] = ""
+    df["final_dns_category"] = ""
+    df["final_hosting_category"] = ""
+    df.loc[has_final_domain, "final_email_provider"] = final_email_provider
+    df.loc[has_final_domain, "final_dns_category"] = final_dns_category
+    df.loc[has_final_domain, "final_hosting_category"] = final_hosting_category
+
+    # Add redirect status classification
+    df["redirect_status"] = classify_redirect_status(df["redirect_count"], df["domain"], df["final_domain"])
+
+    # Store classification results as categoricals (few distinct values per column)
+    df[CATEGORY_COLS] = df[CATEGORY_COLS].astype("category")
+
+    # Display summary of results in the console
+    print("\nClassification Summary:")
+    print(df[[
+        "domain",
+        "email_provider", "dns_category", "hosting_category",
+        "redirect_status"
+    ]].head(20))
+
+    print("\nRedirects Summary:")
+    redirects = df[df["redirect_count"] > 0]
+    if len(redirects) > 0:
+        print(f"Total redirects: {len(redirects)}")
+        print(redirects[[
+            "domain", "final_domain", "redirect_status",
+            "hosting_category", "final_hosting_category"
+        ]].head(10))
     else:
-        return "External redirect"
-
-df["redirect_status"] = df.apply(classify_redirect_status, axis=1)
-
-# Display summary of results in the console
-print("\nClassification Summary:")
-print(df[[
-    "domain",
-    "email_provider", "dns_category", "hosting_category",
-    "redirect_status"
-]].head(20))
-
-print("\nRedirects Summary:")
-redirects = df[df["redirect_count"] > 0]
-if len(redirects) > 0:
-    print(f"Total redirects: {len(redirects)}")
-    print(redirects[[
-        "domain", "final_domain", "redirect_status",
-        "hosting_category", "final_hosting_category"
-    ]].head(10))
-else:
-    print("No redirects found.")
-
-# Save classified results to data folder with timestamp
-timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-data_path_csv = Path(__file__).parent.parent / "data" / f"dns_classified-{timestamp}.csv"
-data_path_json = Path(__file__).parent.parent / "data" / f"dns_classified-{timestamp}.json"
-
-df.to_csv(data_path_csv, index=False)
-print(f"\nSaved classified results to {data_path_csv}")
-
-df.to_json(data_path_json, orient="records", indent=2, force_ascii=False)
-print(f"Saved JSON results to {data_path_json}")
+        print("No redirects found.")
+
+    if checkpoint:
+        # Save classified results to data folder with timestamp
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        data_path = data_dir / f"dns_classified-{timestamp}.parquet"
+
+        df.to_parquet(data_path, index=False, compression="zstd")
+        print(f"\nSaved classified results to {data_path}")
+
+    return df
+
+
+if __name__ == "__main__":
+    data_dir = Path(__file__).parent.parent / "data"
+
+    if len(sys.argv) > 1:
+        # Use file path provided as command line argument
+        input_path = Path(sys.argv[1])
+    else:
+        input_path = find_latest_input(data_dir)
+
+    # Read the raw DNS data
+    run(read_input(input_path), data_dir)
@@ -1,69 +1,48 @@
+import numpy as np
 import pandas as pd
 import sys
 from pathlib import Path
 from datetime import datetime
 
+import dns_classify
+
 
 # ---------------------------------------------------------
 # Helper: Lowercase specific categories for mid-sentence usage
 # ---------------------------------------------------------
 
-def lowercase_category_for_sentence(category: str) -> str:
+# Generic categories and their mid-sentence (lowercase) form
+LOWER_CAT_MAP = {
+    "Other": "other",
+    "Other US": "other US",
+    "Local (.is)": "local (.is)",
+    "Unknown": "unknown",
+}
+
+
+def lowercase_category_for_sentence(category: pd.Series) -> pd.Series:
     """
     Lowercase only generic categories (Other, Other US, Local (.is), Unknown)
     when they appear mid-sentence. Company names remain capitalized.
     """
-    if category == "Other":
-        return "other"
-    elif category == "Other US":
-        return "other US"
-    elif category == "Local (.is)":
-        return "local (.is)"
-    elif category == "Unknown":
-        return "unknown"
-    else:
-        # Keep company/brand names capitalized (Microsoft 365, AWS, etc.)
-        return category
+    # Company/brand names (Microsoft 365, AWS, etc.) are not in the map and keep their value
+    return category.map(LOWER_CAT_MAP).fillna(category).astype("string[pyarrow]")
 
 
 # ---------------------------------------------------------
-# Helper: Classify individual MX or SPF
+# Helper: Normalize string columns
 # ---------------------------------------------------------
 
-def classify_mx_or_spf(mx_or_spf: str, org: str, country: str) -> str:
-    """Classify a single MX or SPF record to determine its category."""
-    mx_or_spf = str(mx_or_spf).strip().lower() if pd.notna(mx_or_spf) else ""
-    org = str(org).strip().lower() if pd.notna(org) else ""
-    country = str(country).strip().lower() if pd.notna(country) else ""
-    
-    # Check for Microsoft
-    if "microsoft" in org or "outlook.com" in mx_or_spf or "office365" in mx_or_spf or "protection.outlook.com" in mx_or_spf:
-        return "Microsoft 365"
-    
-    # Check for Google
-    if "google" in org or "google.com" in mx_or_spf:
-        return "Google Workspace"
-    
-    # Check for Iceland
-    if country == "is" or ".is" in mx_or_spf:
-        return "Local (.is)"
-    
-    # Check for US
-    if country == "us":
-        return "Other US"
-    
-    # Check if unknown
-    if not mx_or_spf and not org:
-        return "Unknown"
-    
-    return "Other"
+def clean_str(series: pd.Series) -> pd.Series:
+    """Convert a column to stripped strings, with missing values as empty strings."""
+    return series.astype("string[pyarrow]").fillna("").str.strip()
 
 
 # ---------------------------------------------------------
 # Part 1: Email Provider Determination (MX + SPF OR-logic)
 # ---------------------------------------------------------
 
-def determine_email_provider(email_provider: str, mx: str, mx_org: str, mx_country: str, spf: str, spf_org: str, spf_country: str):
+def determine_email_provider(email_provider: pd.Series, mx_category: pd.Series, spf_category: pd.Series, mx_org: pd.Series, spf_org: pd.Series):
     """
     Determine effective email provider with Microsoft 365 OR-logic and disclaimers.
     Uses the already-classified email_provider but adds Microsoft detection logic
@@ -72,96 +51,66 @@ def determine_email_provider(email_provider: str, mx: str, mx_org: str, mx_count
     Email provider is ONLY based on original domain (never follows redirects).
     
     Args:
-        email_provider: Already-classified email provider category
-        mx: MX record value
-        mx_org: Organization from MX record lookup
-        mx_country: Country from MX record lookup
-        spf: SPF record value
-        spf_org: Organization from SPF record lookup
-        spf_country: Country from SPF record lookup
+        email_provider: Already-classified email provider categories
+        mx_category: Already-classified categories of the MX records on their own
+        spf_category: Already-classified categories of the SPF records on their own
+        mx_org: Organizations from MX record lookups
+        spf_org: Organizations from SPF record lookups
     
     Returns:
-        Tuple of (effective_provider, has_disclaimer, disclaimer_text)
+        Tuple of Series (effective_provider, has_disclaimer, disclaimer_text)
     """
-    email_provider = str(email_provider).strip() if pd.notna(email_provider) else "Unknown"
-    mx_org = str(mx_org).strip() if pd.notna(mx_org) else ""
-    spf_org = str(spf_org).strip() if pd.notna(spf_org) else ""
-    
-    # Classify MX and SPF individually to compare their categories
-    mx_category = classify_mx_or_spf(mx, mx_org, mx_country)
-    spf_category = classify_mx_or_spf(spf, spf_org, spf_country)
-    
-    mx_is_microsoft = "microsoft" in mx_org.lower()
-    spf_is_microsoft = "microsoft" in spf_org.lower()
-    
-    # Email Rule A — Microsoft 365 OR-logic
-    # If either MX or SPF is Microsoft, ensure it's classified as Microsoft 365
-    if mx_is_microsoft and spf_is_microsoft:
-        return (
-            "Microsoft 365",
-            True,
-            "Microsoft 365 detected in both MX and SPF."
-        )
-    
-    if mx_is_microsoft and not spf_is_microsoft:
-        return (
-            "Microsoft 365",
-            True,
-            "Microsoft 365 detected in MX. SPF does not clearly point to Microsoft 365."
-        )
+    email_provider = clean_str(email_provider)
     
-    if spf_is_microsoft and not mx_is_microsoft:
-        return (
-            "Microsoft 365",
-            True,
-            "SPF includes Microsoft 365 for sending. MX points elsewhere."
-        )
+    # MX and SPF categories are compared by their integer codes (missing values get code -1)
+    mx_codes = pd.Categorical(mx_category, categories=dns_classify.MX_SPF_CATEGORIES).codes
+    spf_codes = pd.Categorical(spf_category, categories=dns_classify.MX_SPF_CATEGORIES).codes
     
-    # Email Rule B — Non-Microsoft resolution
-    # Use the already-classified provider category
+    mx_is_microsoft = clean_str(mx_org).str.lower().str.contains("microsoft", regex=False)
+    spf_is_microsoft = clean_str(spf_org).str.lower().str.contains("microsoft", regex=False)
     
-    # If provider is Unknown, don't add a disclaimer
-    if email_provider == "Unknown":
-        return (email_provider, False, "")
+    unknown_code = dns_classify.MX_SPF_CATEGORIES.index("Unknown")
+    mx_known = mx_codes != unknown_code
+    spf_known = spf_codes != unknown_code
     
-    # For all other providers, add a disclaimer based on MX/SPF category comparison
-    mx_known = mx_category != "Unknown"
-    spf_known = spf_category != "Unknown"
+    # Lowercase only generic categories in mid-sentence (the extra "" entry is for code -1)
+    category_text = lowercase_category_for_sentence(pd.Series(dns_classify.MX_SPF_CATEGORIES + [""])).to_numpy()
+    mx_cat_text = pd.Series(category_text[mx_codes], index=email_provider.index, dtype="string[pyarrow]")
+    spf_cat_text = pd.Series(category_text[spf_codes], index=email_provider.index, dtype="string[pyarrow]")
     
-    if mx_known and spf_known:
-        # Compare CATEGORIES, not org names
-        if mx_category == spf_category:
-            return (
-                email_provider,
-                True,
-                f"{email_provider} detected in both MX and SPF."
-            )
-        else:
-            # Lowercase only generic categories in mid-sentence
-            mx_cat_text = lowercase_category_for_sentence(mx_category)
-            spf_cat_text = lowercase_category_for_sentence(spf_category)
-            return (
-                email_provider,
-                True,
-                f"{email_provider} detected. MX uses {mx_cat_text}, SPF uses {spf_cat_text}."
-            )
+    conditions = [
+        # Email Rule A — Microsoft 365 OR-logic
+        # If either MX or SPF is Microsoft, ensure it's classified as Microsoft 365
+        mx_is_microsoft & spf_is_microsoft,
+        mx_is_microsoft,
+        spf_is_microsoft,
+        # Email Rule B — Non-Microsoft resolution
+        # If provider is Unknown, don't add a disclaimer
+        email_provider.eq("Unknown"),
+        # For all other providers, add a disclaimer based on MX/SPF category comparison
+        # (compare CATEGORIES, not org names)
+        mx_known & spf_known & (mx_codes == spf_codes),
+        mx_known & spf_known,
+        mx_known,
+        spf_known,
+    ]
+    choices = [
+        "Microsoft 365 detected in both MX and SPF.",
+        "Microsoft 365 detected in MX. SPF does not clearly point to Microsoft 365.",
+        "SPF includes Microsoft 365 for sending. MX points elsewhere.",
+        "",
+        email_provider + " detected in both MX and SPF.",
+        email_provider + " detected. MX uses " + mx_cat_text + ", SPF uses " + spf_cat_text + ".",
+        email_provider + " detected in MX. SPF is unknown.",
+        email_provider + " detected in SPF. MX is unknown.",
+    ]
+    # No MX or SPF data
+    disclaimer_text = pd.Series(dns_classify.select(conditions, choices, default=""), index=email_provider.index)
     
-    if mx_known and not spf_known:
-        return (
-            email_provider,
-            True,
-            f"{email_provider} detected in MX. SPF is unknown."
-        )
+    effective_provider = email_provider.mask(mx_is_microsoft | spf_is_microsoft, "Microsoft 365")
+    has_disclaimer = disclaimer_text.ne("")
     
-    if spf_known and not mx_known:
-        return (
-            email_provider,
-            True,
-            f"{email_provider} detected in SPF. MX is unknown."
-        )
-    
-    # No MX or SPF data
-    return (email_provider, False, "")
+    return effective_provider, has_disclaimer, disclaimer_text
 
 
 # ---------------------------------------------------------
@@ -169,65 +118,62 @@ def determine_email_provider(email_provider: str, mx: str, mx_org: str, mx_count
 # ---------------------------------------------------------
 
 def determine_effective_provider_with_redirect(
-    original_provider: str,
-    final_provider: str,
+    original_provider: pd.Series,
+    final_provider: pd.Series,
     service_type: str,
-    final_domain: str = ""
+    final_domain: pd.Series
 ):
     """
     Determine effective provider for DNS or Hosting based on redirect logic.
     
     Args:
-        original_provider: Provider for original domain
-        final_provider: Provider for final domain (empty if no redirect)
+        original_provider: Providers for original domains
+        final_provider: Providers for final domains (empty if no redirect)
         service_type: "dns" or "hosting"
-        final_domain: Final domain name (for tooltip)
+        final_domain: Final domain names (for tooltip)
     
     Returns:
-        Tuple of (effective_provider, has_disclaimer, tooltip)
+        Tuple of Series (effective_provider, has_disclaimer, tooltip)
     """
-    original_provider = str(original_provider).strip() if pd.notna(original_provider) else ""
-    final_provider = str(final_provider).strip() if pd.notna(final_provider) else ""
-    final_domain = str(final_domain).strip() if pd.notna(final_domain) else ""
-    
-    redirect_exists = bool(final_provider)
+    original_provider = clean_str(original_provider)
+    final_provider = clean_str(final_provider)
+    final_domain = clean_str(final_domain)
     
-    # Rule 1a — No redirect
-    if not redirect_exists:
-        return (original_provider, False, "")
+    redirect_exists = final_provider.ne("")
+    final_unknown = final_provider.eq("Unknown")
+    original_unknown = original_provider.eq("Unknown")
+    providers_differ = original_provider.ne(final_provider)
     
-    # Rule 1b — Redirect exists AND final provider is Unknown
-    if final_provider == "Unknown":
-        return (
-            original_provider,
-            True,
-            "Domain redirects but final provider is unknown. Showing original provider."
-        )
-    
-    # Rule 2 — Original provider Unknown AND final provider known
-    if original_provider == "Unknown" and final_provider != "Unknown":
-        return (
-            final_provider,
-            True,
-            f"Original provider unknown. Showing provider after redirect to {final_domain}."
-        )
-    
-    # Rule 3 — Redirect exists AND both providers known AND providers differ
-    if original_provider != final_provider:
-        # Lowercase only generic categories in mid-sentence
-        final_text = lowercase_category_for_sentence(final_provider)
-        return (
-            final_provider,
-            True,
-            f"Original domain used {original_provider}, but redirect target uses {final_text}."
-        )
+    # Lowercase only generic categories in mid-sentence
+    final_text = lowercase_category_for_sentence(final_provider)
     
+    conditions = [
+        # Rule 1a — No redirect
+        ~redirect_exists,
+        # Rule 1b — Redirect exists AND final provider is Unknown
+        final_unknown,
+        # Rule 2 — Original provider Unknown AND final provider known
+        original_unknown,
+        # Rule 3 — Redirect exists AND both providers known AND providers differ
+        providers_differ,
+    ]
+    tooltips = [
+        "",
+        "Domain redirects but final provider is unknown. Showing original provider.",
+        "Original provider unknown. Showing provider after redirect to " + final_domain + ".",
+        "Original domain used " + original_provider + ", but redirect target uses " + final_text + ".",
+    ]
     # Rule 4 — Redirect exists AND both providers known AND providers are the same
-    return (
-        original_provider,
-        True,
-        f"{original_provider} is used on both domains."
+    tooltip = pd.Series(
+        dns_classify.select(conditions, tooltips, default=original_provider + " is used on both domains."),
+        index=original_provider.index,
     )
+    
+    use_final = redirect_exists & ~final_unknown & (original_unknown | providers_differ)
+    effective_provider = final_provider.where(use_final, original_provider)
+    has_disclaimer = redirect_exists
+    
+    return effective_provider, has_disclaimer, tooltip
 
 
 
@@ -235,131 +181,180 @@ def determine_effective_provider_with_redirect(
 # Run effective provider determination
 # ---------------------------------------------------------
 
-# Get input file path
-data_dir = Path(__file__).parent.parent / "data"
-output_dir = Path(__file__).parent.parent / "output"
-
-if len(sys.argv) > 1:
-    # Use file path provided as command line argument
-    input_path = Path(sys.argv[1])
-else:
-    # Find the most recent classified results file in data folder
-    result_files = sorted(data_dir.glob("dns_classified-*.csv"), reverse=True)
+# Find the most recent classified results file in data folder
+def find_latest_input(data_dir: Path) -> Path:
+    result_files = sorted(data_dir.glob("dns_classified-*.parquet"), reverse=True)
     if not result_files:
-        print("Error: No dns_classified-*.csv files found in data folder.")
+        print("Error: No dns_classified-*.parquet files found in data folder.")
         print("Run dns_classify.py first to generate classified data.")
         sys.exit(1)
-    input_path = result_files[0]
-    print(f"Using most recent classified results: {input_path.name}")
-
-# Read the classified data
-df = pd.read_csv(input_path)
-
-# Ensure all required columns exist and are filled
-required_cols = [
-    "email_provider", "mx", "mx_org", "mx_country", "spf", "spf_org", "spf_country",
-    "dns_category", "hosting_category",
-    "final_dns_category", "final_hosting_category",
-    "final_domain"
-]
-
-for col in required_cols:
-    if col not in df.columns:
-        df[col] = ""
-    df[col] = df[col].fillna("")
-
-# Calculate effective providers
-print("\nDetermining effective providers...")
-
-# Part 1: Email Provider (MX + SPF OR-logic, never follows redirects)
-print("Processing email providers...")
-email_results = df.apply(
-    lambda row: determine_email_provider(
-        row["email_provider"],
-        row["mx"],
-        row["mx_org"],
-        row["mx_country"],
-        row["spf"],
-        row["spf_org"],
-        row["spf_country"]
-    ),
-    axis=1
-)
-df["effective_email_provider"] = email_results.apply(lambda x: x[0])
-df["email_disclaimer"] = email_results.apply(lambda x: x[1])
-df["email_disclaimer_text"] = email_results.apply(lambda x: x[2])
-
-# Part 2: DNS Provider (with redirect logic)
-print("Processing DNS providers...")
-dns_results = df.apply(
-    lambda row: determine_effective_provider_with_redirect(
-        row["dns_category"],
-        row["final_dns_category"],
+    print(f"Using most recent classified results: {result_files[0].name}")
+    return result_files[0]
+
+
+# Read classified data from a parquet checkpoint (or a CSV file)
+def read_input(input_path: Path) -> pd.DataFrame:
+    if input_path.suffix == ".csv":
+        return pd.read_csv(input_path, engine="pyarrow", dtype_backend="pyarrow")
+    return pd.read_parquet(input_path)
+
+
+# Classify MX and SPF records on their own for classified files saved before
+# dns_classify stored mx_category/spf_category
+def add_mx_spf_categories(df: pd.DataFrame) -> None:
+    source_cols = ["mx", "mx_org", "mx_country", "spf", "spf_org", "spf_country"]
+    missing_cols = [col for col in source_cols if col not in df.columns]
+    if missing_cols:
+        raise ValueError(
+            f"Input has no mx_category/spf_category columns and is missing {missing_cols} "
+            "to compute them. Re-run dns_classify.py to regenerate the classified data."
+        )
+    
+    print("Classifying MX and SPF records (categories missing from input)...")
+    lc = {col: dns_classify.lower_str(df[col]) for col in source_cols}
+    for record in ["mx", "spf"]:
+        df[f"{record}_category"] = dns_classify.classify_mx_or_spf(
+            lc[record],
+            dns_classify.match_providers(lc[record], dns_classify.EMAIL_RECORD_KEYWORDS),
+            lc[f"{record}_org"],
+            dns_classify.match_providers(lc[f"{record}_org"], dns_classify.ORG_KEYWORDS),
+            lc[f"{record}_country"],
+        )
+
+
+def run(df: pd.DataFrame, output_dir: Path, pretty: bool = False) -> pd.DataFrame:
+    """
+    Determine effective providers for classified DNS data and save the final
+    results to the output folder.
+    
+    Args:
+        df: Classified DNS data (output of dns_classify.run)
+        output_dir: Folder to write dns_full_results-*.csv/json to
+        pretty: Indent the JSON output for readability (slower, larger files)
+    
+    Returns:
+        DataFrame with effective provider and disclaimer columns added
+    """
+    # MX/SPF categories can't be defaulted (an empty category would count as known),
+    # so compute them when the input predates them
+    if "mx_category" not in df.columns or "spf_category" not in df.columns:
+        add_mx_spf_categories(df)
+
+    # Ensure all required columns exist (missing values are handled by clean_str)
+    required_cols = [
+        "email_provider", "mx_category", "spf_category", "mx_org", "spf_org",
+        "dns_category", "hosting_category",
+        "final_dns_category", "final_hosting_category",
+        "final_domain"
+    ]
+
+    missing_cols = [col for col in required_cols if col not in df.columns]
+    df[missing_cols] = ""
+
+    # Calculate effective providers
+    print("\nDetermining effective providers...")
+
+    # Part 1: Email Provider (MX + SPF OR-logic, never follows redirects)
+    print("Processing email providers...")
+    (
+        df["effective_email_provider"],
+        df["email_disclaimer"],
+        df["email_disclaimer_text"],
+    ) = determine_email_provider(
+        df["email_provider"],
+        df["mx_category"],
+        df["spf_category"],
+        df["mx_org"],
+        df["spf_org"],
+    )
+
+    # Part 2: DNS Provider (with redirect logic)
+    print("Processing DNS providers...")
+    (
+        df["effective_dns_category"],
+        df["dns_disclaimer"],
+        df["dns_disclaimer_text"],
+    ) = determine_effective_provider_with_redirect(
+        df["dns_category"],
+        df["final_dns_category"],
         "dns",
-        row["final_domain"]
-    ),
-    axis=1
-)
-df["effective_dns_category"] = dns_results.apply(lambda x: x[0])
-df["dns_disclaimer"] = dns_results.apply(lambda x: x[1])
-df["dns_disclaimer_text"] = dns_results.apply(lambda x: x[2])
-
-# Part 2: Hosting Provider (with redirect logic)
-print("Processing hosting providers...")
-hosting_results = df.apply(
-    lambda row: determine_effective_provider_with_redirect(
-        row["hosting_category"],
-        row["final_hosting_category"],
+        df["final_domain"],
+    )
+
+    # Part 2: Hosting Provider (with redirect logic)
+    print("Processing hosting providers...")
+    (
+        df["effective_hosting_category"],
+        df["hosting_disclaimer"],
+        df["hosting_disclaimer_text"],
+    ) = determine_effective_provider_with_redirect(
+        df["hosting_category"],
+        df["final_hosting_category"],
         "hosting",
-        row["final_domain"]
-    ),
-    axis=1
-)
-df["effective_hosting_category"] = hosting_results.apply(lambda x: x[0])
-df["hosting_disclaimer"] = hosting_results.apply(lambda x: x[1])
-df["hosting_disclaimer_text"] = hosting_results.apply(lambda x: x[2])
-
-# Display summary
-print("\n" + "="*60)
-print("EFFECTIVE PROVIDER SUMMARY")
-print("="*60)
-
-print("\nEmail Providers:")
-print(df["effective_email_provider"].value_counts().to_string())
-
-print("\nDNS Providers:")
-print(df["effective_dns_category"].value_counts().to_string())
-
-print("\nHosting Providers:")
-print(df["effective_hosting_category"].value_counts().to_string())
-
-print("\n" + "="*60)
-print("DISCLAIMER STATISTICS")
-print("="*60)
-print(f"Email disclaimers: {df['email_disclaimer'].sum()} ({df['email_disclaimer'].sum() / len(df) * 100:.1f}%)")
-print(f"DNS disclaimers: {df['dns_disclaimer'].sum()} ({df['dns_disclaimer'].sum() / len(df) * 100:.1f}%)")
-print(f"Hosting disclaimers: {df['hosting_disclaimer'].sum()} ({df['hosting_disclaimer'].sum() / len(df) * 100:.1f}%)")
-
-# Show sample tooltips
-print("\n" + "="*60)
-print("SAMPLE EMAIL TOOLTIPS (first 5 with disclaimers)")
-print("="*60)
-email_with_disclaimers = df[df["email_disclaimer"] == True].head(5)
-for idx, row in email_with_disclaimers.iterrows():
-    print(f"\n{row['domain']}:")
-    print(f"  Provider: {row['effective_email_provider']}")
-    print(f"  Disclaimer: {row['email_disclaimer_text']}")
-
-# Save results with timestamp
-timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-output_path_csv = output_dir / f"dns_full_results-{timestamp}.csv"
-output_path_json = output_dir / f"dns_full_results-{timestamp}.json"
-
-df.to_csv(output_path_csv, index=False)
-print(f"\n" + "="*60)
-print(f"Saved effective provider results to:")
-print(f"  CSV:  {output_path_csv}")
-
-df.to_json(output_path_json, orient="records", indent=2, force_ascii=False)
-print(f"  JSON: {output_path_json}")
-print("="*60)
+        df["final_domain"],
+    )
+
+    # Display summary
+    print("\n" + "="*60)
+    print("EFFECTIVE PROVIDER SUMMARY")
+    print("="*60)
+
+    # Count each effective provider per service in one table
+    summary = (
+        df[["effective_email_provider", "effective_dns_category", "effective_hosting_category"]]
+        .apply(pd.Series.value_counts)
+        .fillna(0)
+        .astype(int)
+    )
+    summary.columns = ["Email", "DNS", "Hosting"]
+    summary = summary.loc[summary.sum(axis=1).sort_values(ascending=False).index]
+    print(summary.to_string())
+
+    print("\n" + "="*60)
+    print("DISCLAIMER STATISTICS")
+    print("="*60)
+    disclaimer_counts = df[["email_disclaimer", "dns_disclaimer", "hosting_disclaimer"]].sum().astype(int)
+    for label, count in zip(["Email", "DNS", "Hosting"], disclaimer_counts):
+        print(f"{label} disclaimers: {count} ({count / len(df) * 100:.1f}%)")
+
+    # Show sample tooltips
+    print("\n" + "="*60)
+    print("SAMPLE EMAIL TOOLTIPS (first 5 with disclaimers)")
+    print("="*60)
+    email_with_disclaimers = df.loc[
+        df["email_disclaimer"], ["domain", "effective_email_provider", "email_disclaimer_text"]
+    ].head(5)
+    for domain, provider, disclaimer in email_with_disclaimers.itertuples(index=False):
+        print(f"\n{domain}:")
+        print(f"  Provider: {provider}")
+        print(f"  Disclaimer: {disclaimer}")
+
+    # Save results with timestamp
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_path_csv = output_dir / f"dns_full_results-{timestamp}.csv"
+    output_path_json = output_dir / f"dns_full_results-{timestamp}.json"
+
+    df.to_csv(output_path_csv, index=False)
+    print(f"\n" + "="*60)
+    print(f"Saved effective provider results to:")
+    print(f"  CSV:  {output_path_csv}")
+
+    df.to_json(output_path_json, orient="records", indent=2 if pretty else None, force_ascii=False)
+    print(f"  JSON: {output_path_json}")
+    print("="*60)
+
+    return df
+
+
+if __name__ == "__main__":
+    data_dir = Path(__file__).parent.parent / "data"
+    output_dir = Path(__file__).parent.parent / "output"
+
+    if len(sys.argv) > 1:
+        # Use file path provided as command line argument
+        input_path = Path(sys.argv[1])
+    else:
+        input_path = find_latest_input(data_dir)
+
+    # Read the classified data
+    run(read_input(input_path), output_dir)
@@ -1,20 +1,80 @@
+import asyncio
+import csv
+import ipaddress
+import json
+import re
+import shelve
+import time
+from concurrent.futures import ThreadPoolExecutor
+import dns.asyncresolver
 import dns.resolver
 from ipwhois import IPWhois
-import pandas as pd
+from ipwhois.rdap import RDAP
 import logging
 import sys
 from pathlib import Path
 from datetime import datetime
-from urllib.parse import urlparse
-import requests
-import urllib3
+import aiohttp
+
+from utils import extract_domain
 
 
 # Configure logging to show INFO level messages
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Disable SSL warnings for unverified HTTPS requests
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# Maximum number of organizations processed at the same time
+MAX_CONCURRENT_ROWS = 64
+
+# Shared resolver with an answer cache, so nameserver and mail server hostnames
+# used by many domains are only resolved once
+resolver = dns.asyncresolver.Resolver(configure=True)
+resolver.cache = dns.resolver.LRUCache(10000)
+resolver.timeout = 2
+resolver.lifetime = 5
+
+# Lookup tasks for SPF a:/include: domains, shared by all rows of a run
+spf_domain_cache = {}
+
+# ASN lookup tasks by IP, shared by all rows of a run
+asn_info_tasks = {}
+
+# DNS/WHOIS columns collected for each domain (also saved with a final_ prefix for redirect targets)
+RECORD_COLS = [
+    "mx", "spf", "mx_asn", "mx_org", "mx_country", "spf_asn", "spf_org", "spf_country",
+    "ns", "dns_asn", "dns_org", "dns_country", "a", "hosting_asn", "hosting_org", "hosting_country",
+]
+
+# Well-known email sending providers identified directly from SPF record text,
+# in priority order: (pattern, (asn, org, country))
+SPF_PROVIDERS = [
+    # Microsoft 365 (also matches spf.protection.outlook.com)
+    ("protection.outlook.com", ("8075", "Microsoft Corporation", "US")),
+    # Google Workspace (also matches _spf.google.com)
+    ("spf.google.com", ("15169", "Google LLC", "US")),
+]
+
+# All SPF provider patterns in one regex, one capture group per provider
+SPF_PROVIDER_PATTERN = re.compile(
+    "|".join(f"({re.escape(pattern)})" for pattern, _ in SPF_PROVIDERS),
+    re.IGNORECASE
+)
+
+# Columns of the raw DNS output file, in order
+FIELDNAMES = [
+    "name_icelandic", "name_english", "tag_icelandic", "tag_english", "url", "domain",
+    "final_url", "final_domain", "redirect_count", "redirect_codes",
+    *RECORD_COLS,
+    *[f"final_{col}" for col in RECORD_COLS],
+]
+
+# How long RDAP results are reused before an IP is looked up again
+RDAP_CACHE_TTL = 7 * 24 * 3600
+
+# RDAP results by IP address and by network CIDR, shared across runs via the data folder
+rdap_cache = {}
+
+# Cached networks parsed for prefix lookups: (IP version, prefix length) -> {network bits: entry}
+rdap_networks = {}
 
 
 # ---------------------------------------------------------
@@ -22,12 +82,30 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 # ---------------------------------------------------------
 
 # Helper to join multiple DNS records into a single string
+# (sorted, since NS records have no meaningful order)
 def join_records(rrset):
     return "; ".join(sorted({r.to_text().rstrip('.') for r in rrset}))
 
 
+# Request a URL following redirects and return (final_url, redirect_count, redirect_codes)
+async def follow_redirects(session, url):
+    # Use HEAD to avoid downloading the page body
+    async with session.head(url, allow_redirects=True) as response:
+        if response.status not in (405, 501):
+            redirect_count = len(response.history)
+            redirect_codes = "; ".join([str(r.status) for r in response.history])
+            return str(response.url), redirect_count, redirect_codes
+    
+    # Some servers don't support HEAD, so retry with GET and drop the body unread
+    async with session.get(url, allow_redirects=True) as response:
+        redirect_count = len(response.history)
+        redirect_codes = "; ".join([str(r.status) for r in response.history])
+        response.release()
+        return str(response.url), redirect_count, redirect_codes
+
+
 # Follow HTTP redirects and return final URL and redirect info
-def get_final_url(url, timeout=10):
+async def get_final_url(session, url):
     """
     Follow redirects and return the final URL.
     Returns: (final_url, redirect_count, redirect_codes)
@@ -36,31 +114,11 @@ def get_final_url(url, timeout=10):
         return None, 0, ""
     
     try:
-        # Make HEAD request to follow redirects
-        response = requests.head(
-            url,
-            allow_redirects=True,
-            timeout=timeout,
-            verify=False  # Some .is sites have SSL issues
-        )
-        
-        # Track redirect chain
-        redirect_count = len(response.history)
-        redirect_codes = "; ".join([str(r.status_code) for r in response.history]) if response.history else ""
-        
-        return response.url, redirect_count, redirect_codes
-    except requests.exceptions.SSLError:
+        return await follow_redirects(session, url)
+    except aiohttp.ClientSSLError:
         # Try with http if https fails
         try:
-            http_url = url.replace("https://", "http://")
-            response = requests.head(
-                http_url,
-                allow_redirects=True,
-                timeout=timeout
-            )
-            redirect_count = len(response.history)
-            redirect_codes = "; ".join([str(r.status_code) for r in response.history]) if response.history else ""
-            return response.url, redirect_count, redirect_codes
+            return await follow_redirects(session, url.replace("https://", "http://"))
         except Exception as e:
             logging.warning(f"Failed to get final URL for {url}: {e}")
             return url, 0, ""
@@ -69,41 +127,21 @@ def get_final_url(url, timeout=10):
         return url, 0, ""
 
 
-# Extract domain from URL
-def extract_domain_from_url(url):
-    """Extract the domain from a URL."""
-    if not url:
-        return None
-    try:
-        parsed = urlparse(url)
-        domain = parsed.netloc or parsed.path
-        # Remove www. prefix if present
-        if domain.startswith("www."):
-            domain = domain[4:]
-        # Remove port number if present
-        if ":" in domain:
-            domain = domain.split(":")[0]
-        # Remove trailing slashes and paths
-        domain = domain.split('/')[0]
-        return domain if domain else None
-    except Exception as e:
-        logging.warning(f"Failed to extract domain from {url}: {e}")
-        return None
-
-
 # Get mail server (MX) records for a domain
-def get_mx(domain):
+async def get_mx(domain):
     try:
-        answers = dns.resolver.resolve(domain, "MX")
-        hosts = [r.exchange.to_text().rstrip('.') for r in answers]
-        return "; ".join(sorted(set(hosts)))
+        answers = await resolver.resolve(domain, "MX")
+        # List mail servers in preference order (primary first), so the provider lookup
+        # uses the primary server; ties are ordered by name to keep output deterministic
+        records = sorted((r.preference, r.exchange.to_text().rstrip('.')) for r in answers)
+        return "; ".join(dict.fromkeys(host for _, host in records))
     except Exception as e:
         logging.warning(f"Failed to get MX records for {domain}: {e}")
         return ""
 
 
 # Get email provider info by looking up the first mail server's IP (inbound mail)
-def get_email_provider_info_mx(mx_records):
+async def get_email_provider_info_mx(mx_records):
     """Look up ASN/org info for mail servers (inbound)."""
     if not mx_records:
         return "", "", ""
@@ -115,7 +153,7 @@ def get_email_provider_info_mx(mx_records):
             return "", "", ""
         
         # Resolve the mail server to an IP address
-        mx_answers = dns.resolver.resolve(first_mx, "A")
+        mx_answers = await resolver.resolve(first_mx, "A")
         if not mx_answers:
             return "", "", ""
         
@@ -124,7 +162,7 @@ def get_email_provider_info_mx(mx_records):
             return "", "", ""
         
         # Get ASN info for the mail server IP
-        asn, org, country = get_asn_info(mx_ip)
+        asn, org, country = await lookup_asn_info(mx_ip)
         return asn, org, country
         
     except Exception as e:
@@ -132,79 +170,73 @@ def get_email_provider_info_mx(mx_records):
         return "", "", ""
 
 
+# Split an SPF record into its ip4:/ip6: addresses, a: domains and include: domains in one pass
+# (mx and mx: directives would need an MX lookup for the domain, skipped for now)
+def parse_spf(spf_record):
+    ips, a_domains, include_domains = [], [], []
+    for part in spf_record.split():
+        if part.startswith(("ip4:", "ip6:")):
+            # Remove CIDR notation if present
+            ips.append(part[4:].split("/", 1)[0])
+        elif part.startswith("a:"):
+            a_domains.append(part[2:])
+        elif part.startswith("include:"):
+            include_domains.append(part[8:])
+    return ips, a_domains, include_domains
+
+
+# Look up ASN/org info for the first IP of a domain referenced from SPF records
+async def resolve_spf_domain(domain):
+    try:
+        answers = await resolver.resolve(domain, "A")
+        ip = str(answers[0].address)  # type: ignore
+        return await lookup_asn_info(ip)
+    except Exception:
+        return "", "", ""
+
+
+# Start (or reuse) the lookup for an SPF a:/include: domain, since most SPF records
+# reference the same few domains
+def get_spf_domain_info(domain):
+    if domain not in spf_domain_cache:
+        spf_domain_cache[domain] = asyncio.ensure_future(resolve_spf_domain(domain))
+    return spf_domain_cache[domain]
+
+
 # Get email sending provider info from SPF record (outbound mail)
-def get_email_provider_info_spf(spf_record):
+async def get_email_provider_info_spf(spf_record):
     """Determine email sending provider from SPF record (outbound)."""
     if not spf_record:
         return "", "", ""
     
-    spf_lower = spf_record.lower()
-    
-    # Microsoft 365 - check first for cloud providers
-    if "spf.protection.outlook.com" in spf_lower or "protection.outlook.com" in spf_lower:
-        return "8075", "Microsoft Corporation", "US"
-    
-    # Google Workspace
-    if "spf.google.com" in spf_lower or "_spf.google.com" in spf_lower:
-        return "15169", "Google LLC", "US"
+    # Well-known cloud providers - scan the record once and pick the highest priority match
+    matched = {m.lastindex for m in SPF_PROVIDER_PATTERN.finditer(spf_record)}
+    if matched:
+        return SPF_PROVIDERS[min(matched) - 1][1]
     
     # If no major cloud provider, try to resolve SPF includes or IP addresses
-    # Parse SPF record for ip4:, ip6:, a:, mx:, include: directives
-    parts = spf_record.split()
-    
-    # First, look for explicit IP addresses (ip4: or ip6:)
-    for part in parts:
-        if part.startswith("ip4:"):
-            ip = part[4:].split("/")[0]  # Remove CIDR notation if present
-            asn, org, country = get_asn_info(ip)
-            if asn:
-                return asn, org, country
-        elif part.startswith("ip6:"):
-            ip = part[4:].split("/")[0]
-            asn, org, country = get_asn_info(ip)
-            if asn:
-                return asn, org, country
+    ips, a_domains, include_domains = parse_spf(spf_record)
     
-    # Second, look for a: or mx: directives (domain lookups)
-    for part in parts:
-        if part.startswith("a:"):
-            domain = part[2:]
-            try:
-                answers = dns.resolver.resolve(domain, "A")
-                if answers:
-                    ip = str(answers[0].address)  # type: ignore
-                    asn, org, country = get_asn_info(ip)
-                    if asn:
-                        return asn, org, country
-            except:
-                pass
-        elif part == "mx" or part.startswith("mx:"):
-            # Would need to look up MX for the domain, skip for now
-            pass
+    # First, look up all explicit IP addresses (ip4: or ip6:) at once
+    results = await asyncio.gather(*[lookup_asn_info(ip) for ip in ips])
+    for asn, org, country in results:
+        if asn:
+            return asn, org, country
     
-    # Third, look for include: directives
-    for part in parts:
-        if part.startswith("include:"):
-            include_domain = part[8:]
-            try:
-                # Try to get A record for the included domain
-                answers = dns.resolver.resolve(include_domain, "A")
-                if answers:
-                    ip = str(answers[0].address)  # type: ignore
-                    asn, org, country = get_asn_info(ip)
-                    if asn:
-                        return asn, org, country
-            except:
-                pass
+    # Then resolve all a: and include: domains at once, checking a: domains before include: domains
+    results = await asyncio.gather(*[get_spf_domain_info(domain) for domain in a_domains + include_domains])
+    for asn, org, country in results:
+        if asn:
+            return asn, org, country
     
     # If nothing found, return empty
     return "", "", ""
 
 
 # Get nameserver (NS) records for a domain
-def get_ns(domain):
+async def get_ns(domain):
     try:
-        answers = dns.resolver.resolve(domain, "NS")
+        answers = await resolver.resolve(domain, "NS")
         return join_records(answers)
     except Exception as e:
         logging.warning(f"Failed to get NS records for {domain}: {e}")
@@ -212,7 +244,7 @@ def get_ns(domain):
 
 
 # Get DNS provider info by looking up the first nameserver's IP
-def get_dns_provider_info(ns_records):
+async def get_dns_provider_info(ns_records):
     """Look up ASN/org info for DNS nameservers."""
     if not ns_records:
         return "", "", ""
@@ -224,7 +256,7 @@ def get_dns_provider_info(ns_records):
             return "", "", ""
         
         # Resolve the nameserver to an IP address
-        ns_answers = dns.resolver.resolve(first_ns, "A")
+        ns_answers = await resolver.resolve(first_ns, "A")
         if not ns_answers:
             return "", "", ""
         
@@ -233,7 +265,7 @@ def get_dns_provider_info(ns_records):
             return "", "", ""
         
         # Get ASN info for the nameserver IP
-        asn, org, country = get_asn_info(ns_ip)
+        asn, org, country = await lookup_asn_info(ns_ip)
         return asn, org, country
         
     except Exception as e:
@@ -242,9 +274,9 @@ def get_dns_provider_info(ns_records):
 
 
 # Get IP address (A) records for a domain
-def get_a(domain):
+async def get_a(domain):
     try:
-        answers = dns.resolver.resolve(domain, "A")
+        answers = await resolver.resolve(domain, "A")
         return "; ".join(sorted({r.address for r in answers}))
     except Exception as e:
         logging.warning(f"Failed to get A records for {domain}: {e}")
@@ -252,9 +284,9 @@ def get_a(domain):
 
 
 # Get SPF (email authentication) records from TXT records
-def get_spf(domain):
+async def get_spf(domain):
     try:
-        answers = dns.resolver.resolve(domain, "TXT")
+        answers = await resolver.resolve(domain, "TXT")
         spf_records = [
             r.to_text().strip('"')
             for r in answers
@@ -266,23 +298,112 @@ def get_spf(domain):
         return ""
 
 
+# Load previously saved RDAP results, dropping entries older than the TTL
+def load_rdap_cache(cache_path):
+    rdap_cache.clear()
+    rdap_networks.clear()
+    if not cache_path.exists():
+        return
+    try:
+        entries = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable RDAP cache {cache_path}: {e}")
+        return
+    now = time.time()
+    for key, entry in entries.items():
+        if now - entry["time"] >= RDAP_CACHE_TTL:
+            continue
+        if "/" in key:
+            key = index_network(key, entry)
+            if not key:
+                continue
+        rdap_cache[key] = entry
+    print(f"Loaded {len(rdap_cache)} cached RDAP results from {cache_path.name}")
+
+
+# Save RDAP results so later runs can skip the lookups
+def save_rdap_cache(cache_path):
+    cache_path.write_text(json.dumps(rdap_cache), encoding="utf-8")
+
+
+# Parse a cached network once and index it for prefix lookups
+# Returns the canonical CIDR string (e.g. "10.1.2.3/8" -> "10.0.0.0/8"), or None if invalid
+def index_network(cidr, entry):
+    try:
+        network = ipaddress.ip_network(cidr.strip(), strict=False)
+    except ValueError:
+        return None
+    host_bits = network.max_prefixlen - network.prefixlen
+    networks = rdap_networks.setdefault((network.version, network.prefixlen), {})
+    networks[int(network.network_address) >> host_bits] = entry
+    return str(network)
+
+
+# Find a cached RDAP result for the IP itself
+def get_cached_asn_info(ip):
+    entry = rdap_cache.get(ip)
+    if entry:
+        return tuple(entry["result"])
+    return None
+
+
+# Find a cached RDAP result for the most specific network containing the IP that is
+# announced by the same ASN (a more specific reassignment to another ASN isn't cached
+# under its parent's network, so the parent's result is only reused when the ASN agrees)
+def get_cached_network_info(ip, asn):
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return None
+    # Check the cached prefix lengths from longest to shortest, so a /24 wins over its parent /8
+    prefixes = sorted(
+        (key for key in list(rdap_networks) if key[0] == address.version),
+        key=lambda key: key[1],
+        reverse=True
+    )
+    for key in prefixes:
+        entry = rdap_networks[key].get(int(address) >> (address.max_prefixlen - key[1]))
+        if entry and entry["result"][0] == asn:
+            return entry
+    return None
+
+
 # Look up ASN (Autonomous System Number) and organization info for an IP address
 # This tells us who is hosting the website
 def get_asn_info(ip):
     if not ip:
         return "", "", ""
+    
+    cached = get_cached_asn_info(ip)
+    if cached:
+        return cached
+    
     try:
         obj = IPWhois(ip)
-        res = obj.lookup_rdap()
         
-        # Get ASN number
-        asn = res.get("asn", "")
+        # Get ASN number, description and country with a single lightweight ASN lookup
+        asn_data = obj.ipasn.lookup()
+        asn = asn_data.get("asn") or ""
+        
+        # Reuse the RDAP result of a cached network containing this IP if it has the same ASN
+        entry = get_cached_network_info(ip, asn) if asn else None
+        if entry:
+            rdap_cache[ip] = entry
+            return tuple(entry["result"])
+        
+        # Get network and contact details from RDAP, passing the ASN data along so
+        # it isn't looked up a second time
+        try:
+            res = RDAP(obj.net).lookup(asn_data=asn_data, depth=0)
+        except Exception as e:
+            logging.warning(f"Failed to get RDAP info for IP {ip}, using ASN info only: {e}")
+            res = {}
         
         # Get network information
         network = res.get("network") or {}
         
         # Get country code from multiple possible locations
-        country = res.get("asn_country_code", "") or network.get("country", "")
+        country = asn_data.get("asn_country_code") or network.get("country") or ""
         
         # Try to get organization info from objects array (most detailed and reliable)
         objects = res.get("objects", {})
@@ -309,11 +430,21 @@ def get_asn_info(ip):
         # Fallback chain: contact org > ASN description > network name
         final_org = (
             org_from_contact or 
-            res.get("asn_description", "") or 
+            asn_data.get("asn_description", "") or 
             network.get("name", "") or 
             ""
         )
         
+        # Cache by IP and by every CIDR of the network, so other IPs in the same prefix reuse it
+        # (only complete results, so IPs whose RDAP lookup failed are retried next run)
+        if res:
+            entry = {"result": [asn, final_org, country], "time": time.time()}
+            rdap_cache[ip] = entry
+            for cidr in (network.get("cidr") or "").split(","):
+                cidr = index_network(cidr, entry)
+                if cidr:
+                    rdap_cache[cidr] = entry
+        
         return asn, final_org, country
         
     except Exception as e:
@@ -321,129 +452,119 @@ def get_asn_info(ip):
         return "", "", ""
     
 
+# Start (or reuse) the ASN lookup for an IP, so hosting, NS, MX and SPF lookups
+# hitting the same IP at the same time share one RDAP query
+def lookup_asn_info(ip):
+    if ip not in asn_info_tasks:
+        asn_info_tasks[ip] = asyncio.ensure_future(asyncio.to_thread(get_asn_info, ip))
+    return asn_info_tasks[ip]
+
+
 # ---------------------------------------------------------
 # Run DNS lookups
 # ---------------------------------------------------------
 
-# Get input file path
-data_dir = Path(__file__).parent.parent / "data"
-
-if len(sys.argv) > 1:
-    # Use file path provided as command line argument
-    input_path = Path(sys.argv[1])
-    print(f"Using provided file: {input_path}")
-else:
-    # Find the most recent island.is government agencies file
+# Find the most recent island.is government agencies file
+def find_latest_input(data_dir):
     csv_files = sorted(data_dir.glob("island_is_government_agencies-*.csv"), reverse=True)
     if not csv_files:
         print("Error: No island.is government agencies CSV found in data folder.")
         print("Run script/scrape_island_is.py first to scrape organizations.")
-        exit(1)
+        sys.exit(1)
     
-    input_path = csv_files[0]
-    print(f"Using most recent organizations file: {input_path.name}")
+    print(f"Using most recent organizations file: {csv_files[0].name}")
+    return csv_files[0]
+
+
+# Collect DNS/hosting information for a single domain
+async def analyze_domain(domain):
+    # Query A, NS, MX and TXT records at the same time
+    a_record, ns_records, mx_records, spf_record = await asyncio.gather(
+        get_a(domain),
+        get_ns(domain),
+        get_mx(domain),
+        get_spf(domain)
+    )
+    first_ip = a_record.split(";")[0].strip() if a_record else ""
+
+    # Look up hosting, DNS provider and email provider info - both inbound (MX) and outbound (SPF)
+    (
+        (asn, hosting_org, hosting_country),
+        (dns_asn, dns_org, dns_country),
+        (mx_asn, mx_org, mx_country),
+        (spf_asn, spf_org, spf_country),
+    ) = await asyncio.gather(
+        lookup_asn_info(first_ip),
+        get_dns_provider_info(ns_records),
+        get_email_provider_info_mx(mx_records),
+        get_email_provider_info_spf(spf_record)
+    )
+
+    return {
+        "mx": mx_records,
+        "spf": spf_record,
+        "ns": ns_records,
+        "a": a_record,
+        "hosting_asn": asn,
+        "hosting_org": hosting_org,
+        "hosting_country": hosting_country,
+        "dns_asn": dns_asn,
+        "dns_org": dns_org,
+        "dns_country": dns_country,
+        "mx_asn": mx_asn,
+        "mx_org": mx_org,
+        "mx_country": mx_country,
+        "spf_asn": spf_asn,
+        "spf_org": spf_org,
+        "spf_country": spf_country,
+    }
+
+
+# Look up a domain and save the results, so an interrupted run can pick up where it left off
+async def analyze_and_save_domain(domain, saved_results):
+    results = await analyze_domain(domain)
+    saved_results[domain] = results
+    return results
 
-# Read the CSV file
-orgs_df = pd.read_csv(input_path)
 
-rows = []
-dns_cache = {}  # Cache to store DNS lookup results by domain
+# Start (or reuse) the lookup for a domain so rows sharing a domain only look it up once
+def lookup_domain(domain, label, dns_cache, saved_results):
+    if domain in dns_cache:
+        print(f"Using cached results for {label} domain {domain}")
+    elif domain in saved_results:
+        print(f"Using saved results for {label} domain {domain}")
+        dns_cache[domain] = asyncio.get_running_loop().create_future()
+        dns_cache[domain].set_result(saved_results[domain])
+    else:
+        print(f"Analyzing {label} domain {domain}...")
+        dns_cache[domain] = asyncio.ensure_future(analyze_and_save_domain(domain, saved_results))
+    return dns_cache[domain]
+
 
-# Loop through each domain and collect DNS/hosting information
-for _, row in orgs_df.iterrows():
+# Check redirects and look up DNS/hosting information for one organization
+async def process_row(row, session, dns_cache, saved_results, semaphore):
     domain = row['domain']
     url = row['url']
-    
+
     # Skip if domain is empty or NaN
-    if pd.isna(domain) or not domain or str(domain).strip() == "":
+    if not domain or domain.strip() == "":
         print(f"Skipping empty domain for {row.get('name_icelandic', 'unknown')}")
-        continue
-    
-    # Check for redirects and get final URL
-    print(f"Checking redirects for {url}...")
-    final_url, redirect_count, redirect_codes = get_final_url(url)
-    final_domain = extract_domain_from_url(final_url)
-    
-    # DNS lookup for ORIGINAL domain (for email, DNS, etc.)
-    if domain not in dns_cache:
-        print(f"Analyzing original domain {domain}...")
-        a_record = get_a(domain)
-        first_ip = a_record.split(";")[0].strip() if a_record else ""
-        asn, hosting_org, hosting_country = get_asn_info(first_ip)
-        
-        # Get DNS provider info
-        ns_records = get_ns(domain)
-        dns_asn, dns_org, dns_country = get_dns_provider_info(ns_records)
-        
-        # Get email provider info - both inbound (MX) and outbound (SPF)
-        mx_records = get_mx(domain)
-        spf_record = get_spf(domain)
-        mx_asn, mx_org, mx_country = get_email_provider_info_mx(mx_records)
-        spf_asn, spf_org, spf_country = get_email_provider_info_spf(spf_record)
-
-        dns_cache[domain] = {
-            "mx": mx_records,
-            "spf": spf_record,
-            "ns": ns_records,
-            "a": a_record,
-            "hosting_asn": asn,
-            "hosting_org": hosting_org,
-            "hosting_country": hosting_country,
-            "dns_asn": dns_asn,
-            "dns_org": dns_org,
-            "dns_country": dns_country,
-            "mx_asn": mx_asn,
-            "mx_org": mx_org,
-            "mx_country": mx_country,
-            "spf_asn": spf_asn,
-            "spf_org": spf_org,
-            "spf_country": spf_country,
-        }
-    else:
-        print(f"Using cached results for original domain {domain}")
-    
-    # DNS lookup for FINAL domain (if different from original)
-    final_dns = None
-    if redirect_count > 0 and final_domain and final_domain != domain:
-        if final_domain not in dns_cache:
-            print(f"Analyzing final domain {final_domain}...")
-            a_record_final = get_a(final_domain)
-            first_ip_final = a_record_final.split(";")[0].strip() if a_record_final else ""
-            asn_final, hosting_org_final, hosting_country_final = get_asn_info(first_ip_final)
-            
-            # Get DNS provider info for final domain
-            ns_records_final = get_ns(final_domain)
-            dns_asn_final, dns_org_final, dns_country_final = get_dns_provider_info(ns_records_final)
-            
-            # Get email provider info for final domain - both inbound (MX) and outbound (SPF)
-            mx_records_final = get_mx(final_domain)
-            spf_record_final = get_spf(final_domain)
-            mx_asn_final, mx_org_final, mx_country_final = get_email_provider_info_mx(mx_records_final)
-            spf_asn_final, spf_org_final, spf_country_final = get_email_provider_info_spf(spf_record_final)
-
-            dns_cache[final_domain] = {
-                "mx": mx_records_final,
-                "spf": spf_record_final,
-                "ns": ns_records_final,
-                "a": a_record_final,
-                "hosting_asn": asn_final,
-                "hosting_org": hosting_org_final,
-                "hosting_country": hosting_country_final,
-                "dns_asn": dns_asn_final,
-                "dns_org": dns_org_final,
-                "dns_country": dns_country_final,
-                "mx_asn": mx_asn_final,
-                "mx_org": mx_org_final,
-                "mx_country": mx_country_final,
-                "spf_asn": spf_asn_final,
-                "spf_org": spf_org_final,
-                "spf_country": spf_country_final,
-            }
-        else:
-            print(f"Using cached results for final domain {final_domain}")
-        
-        final_dns = dns_cache[final_domain]
-    
+        return None
+
+    async with semaphore:
+        # Check for redirects and get final URL
+        print(f"Checking redirects for {url}...")
+        final_url, redirect_count, redirect_codes = await get_final_url(session, url)
+        final_domain = extract_domain(final_url)
+
+        # DNS lookup for ORIGINAL domain (for email, DNS, etc.)
+        original_dns = await lookup_domain(domain, "original", dns_cache, saved_results)
+
+        # DNS lookup for FINAL domain (if different from original)
+        final_dns = None
+        if redirect_count > 0 and final_domain and final_domain != domain:
+            final_dns = await lookup_domain(final_domain, "final", dns_cache, saved_results)
+
     # Collect all the data for this domain
     data_row = {
         "name_icelandic": row['name_icelandic'],
@@ -453,87 +574,119 @@ for _, row in orgs_df.iterrows():
         "url": url,
         "domain": domain,
         "final_url": final_url if redirect_count > 0 and final_domain != domain else "",
-        "final_domain": final_domain if redirect_count > 0 and final_domain != domain else "",
+        "final_domain": (final_domain or "") if redirect_count > 0 and final_domain != domain else "",
         "redirect_count": redirect_count,
         "redirect_codes": redirect_codes,
-        # Original domain DNS data
-        "mx": dns_cache[domain]["mx"],
-        "spf": dns_cache[domain]["spf"],
-        "mx_asn": dns_cache[domain]["mx_asn"],
-        "mx_org": dns_cache[domain]["mx_org"],
-        "mx_country": dns_cache[domain]["mx_country"],
-        "spf_asn": dns_cache[domain]["spf_asn"],
-        "spf_org": dns_cache[domain]["spf_org"],
-        "spf_country": dns_cache[domain]["spf_country"],
-        "ns": dns_cache[domain]["ns"],
-        "dns_asn": dns_cache[domain]["dns_asn"],
-        "dns_org": dns_cache[domain]["dns_org"],
-        "dns_country": dns_cache[domain]["dns_country"],
-        "a": dns_cache[domain]["a"],
-        "hosting_asn": dns_cache[domain]["hosting_asn"],
-        "hosting_org": dns_cache[domain]["hosting_org"],
-        "hosting_country": dns_cache[domain]["hosting_country"],
-        # Final domain DNS data (only if redirect occurred and domain is different)
-        "final_mx": final_dns["mx"] if final_dns else "",
-        "final_spf": final_dns["spf"] if final_dns else "",
-        "final_mx_asn": final_dns["mx_asn"] if final_dns else "",
-        "final_mx_org": final_dns["mx_org"] if final_dns else "",
-        "final_mx_country": final_dns["mx_country"] if final_dns else "",
-        "final_spf_asn": final_dns["spf_asn"] if final_dns else "",
-        "final_spf_org": final_dns["spf_org"] if final_dns else "",
-        "final_spf_country": final_dns["spf_country"] if final_dns else "",
-        "final_ns": final_dns["ns"] if final_dns else "",
-        "final_dns_asn": final_dns["dns_asn"] if final_dns else "",
-        "final_dns_org": final_dns["dns_org"] if final_dns else "",
-        "final_dns_country": final_dns["dns_country"] if final_dns else "",
-        "final_a": final_dns["a"] if final_dns else "",
-        "final_hosting_asn": final_dns["hosting_asn"] if final_dns else "",
-        "final_hosting_org": final_dns["hosting_org"] if final_dns else "",
-        "final_hosting_country": final_dns["hosting_country"] if final_dns else "",
     }
-    rows.append(data_row)
-
-# Create a DataFrame (table) from all collected data
-df = pd.DataFrame(rows)
-
-# Replace any missing values with empty strings
-df["mx"] = df["mx"].fillna("")
-df["spf"] = df["spf"].fillna("")
-df["mx_asn"] = df["mx_asn"].fillna("")
-df["mx_org"] = df["mx_org"].fillna("")
-df["mx_country"] = df["mx_country"].fillna("")
-df["spf_asn"] = df["spf_asn"].fillna("")
-df["spf_org"] = df["spf_org"].fillna("")
-df["spf_country"] = df["spf_country"].fillna("")
-df["ns"] = df["ns"].fillna("")
-df["dns_asn"] = df["dns_asn"].fillna("")
-df["dns_org"] = df["dns_org"].fillna("")
-df["dns_country"] = df["dns_country"].fillna("")
-df["a"] = df["a"].fillna("")
-df["hosting_asn"] = df["hosting_asn"].fillna("")
-df["hosting_org"] = df["hosting_org"].fillna("")
-df["hosting_country"] = df["hosting_country"].fillna("")
-df["final_mx"] = df["final_mx"].fillna("")
-df["final_spf"] = df["final_spf"].fillna("")
-df["final_mx_asn"] = df["final_mx_asn"].fillna("")
-df["final_mx_org"] = df["final_mx_org"].fillna("")
-df["final_mx_country"] = df["final_mx_country"].fillna("")
-df["final_spf_asn"] = df["final_spf_asn"].fillna("")
-df["final_spf_org"] = df["final_spf_org"].fillna("")
-df["final_spf_country"] = df["final_spf_country"].fillna("")
-df["final_ns"] = df["final_ns"].fillna("")
-df["final_dns_asn"] = df["final_dns_asn"].fillna("")
-df["final_dns_org"] = df["final_dns_org"].fillna("")
-df["final_dns_country"] = df["final_dns_country"].fillna("")
-df["final_a"] = df["final_a"].fillna("")
-df["final_hosting_asn"] = df["final_hosting_asn"].fillna("")
-df["final_hosting_org"] = df["final_hosting_org"].fillna("")
-df["final_hosting_country"] = df["final_hosting_country"].fillna("")
-
-# Save raw DNS data to data folder with timestamp
-timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-output_path = Path(__file__).parent.parent / "data" / f"dns_raw-{timestamp}.csv"
-df.to_csv(output_path, index=False)
-print(f"\nSaved raw DNS data to {output_path}")
-print(f"Total domains analyzed: {len(df)}")
-print(f"Unique domains looked up: {len(dns_cache)}")
+    for col in RECORD_COLS:
+        # Original domain DNS data, and final domain DNS data (only if redirect occurred and domain is different)
+        data_row[col] = original_dns[col]
+        data_row[f"final_{col}"] = final_dns[col] if final_dns else ""
+    return data_row
+
+
+# Process all organizations concurrently, writing each result row in input order
+# as soon as it and all rows before it are done
+async def process_all(orgs, dns_cache, saved_results, writer, output_file):
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_ROWS)
+    rows_written = 0
+    rows_failed = 0
+    
+    # Blocking IPWhois lookups run in worker threads - size the pool to match the
+    # number of rows in flight instead of the small CPU-based default
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=MAX_CONCURRENT_ROWS))
+    
+    # One shared session so TCP connections and DNS answers are pooled across requests
+    # (SSL verification is off since some .is sites have SSL issues)
+    connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, ssl=False)
+    timeout = aiohttp.ClientTimeout(total=10)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        tasks = [
+            asyncio.ensure_future(process_row(row, session, dns_cache, saved_results, semaphore))
+            for row in orgs
+        ]
+        for task in tasks:
+            try:
+                data_row = await task
+            except Exception as e:
+                logging.warning(f"Failed to process organization: {e}")
+                rows_failed += 1
+                continue
+            if data_row is not None:
+                writer.writerow(data_row)
+                output_file.flush()
+                rows_written += 1
+    
+    return rows_written, rows_failed
+
+
+# Send DNS queries to specific nameservers (e.g. a local caching resolver) instead
+# of the system resolver
+def use_nameservers(nameservers):
+    resolver.nameservers = list(nameservers)
+    print(f"Using nameservers: {', '.join(resolver.nameservers)}")
+
+
+# Look up DNS/hosting information for every organization and save raw results
+def run(input_path, data_dir, nameservers=None):
+    if nameservers:
+        use_nameservers(nameservers)
+    dns_cache = {}  # Cache to store DNS lookup tasks by domain
+    spf_domain_cache.clear()
+    asn_info_tasks.clear()
+    rdap_cache_path = data_dir / "rdap_cache.json"
+    load_rdap_cache(rdap_cache_path)
+
+    # Read the organizations file
+    with open(input_path, encoding="utf-8", newline="") as f:
+        orgs = list(csv.DictReader(f))
+
+    # Domain results saved as they complete, kept until this input file has been fully processed
+    progress_path = data_dir / f"dns_progress-{Path(input_path).stem}"
+
+    # Save raw DNS data to data folder with timestamp, one row at a time
+    # (every value is already a string or number, so no missing-value cleanup is needed)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_path = data_dir / f"dns_raw-{timestamp}.csv"
+    try:
+        with shelve.open(str(progress_path)) as saved_results, \
+                open(output_path, "w", encoding="utf-8", newline="") as output_file:
+            if saved_results:
+                print(f"Resuming with {len(saved_results)} domains saved by an interrupted run")
+            writer = csv.DictWriter(output_file, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            rows_written, rows_failed = asyncio.run(
+                process_all(orgs, dns_cache, saved_results, writer, output_file)
+            )
+    finally:
+        save_rdap_cache(rdap_cache_path)
+
+    print(f"\nSaved raw DNS data to {output_path}")
+    print(f"Total domains analyzed: {rows_written}")
+    print(f"Unique domains looked up: {len(dns_cache)}")
+
+    if rows_failed:
+        # Keep the saved domains so a rerun only redoes the failed organizations,
+        # and fail the stage so the pipeline doesn't continue on partial data
+        print(f"\nError: {rows_failed} organizations failed and are missing from the output.")
+        print(f"Run again on {Path(input_path).name} to resume with the saved results.")
+        sys.exit(1)
+
+    # All organizations are done, so the next run starts fresh
+    for path in data_dir.glob(f"{progress_path.name}*"):
+        path.unlink()
+    
+    return output_path
+
+
+if __name__ == "__main__":
+    data_dir = Path(__file__).parent.parent / "data"
+    
+    if len(sys.argv) > 1:
+        # Use file path provided as command line argument
+        input_path = Path(sys.argv[1])
+        print(f"Using provided file: {input_path}")
+    else:
+        input_path = find_latest_input(data_dir)
+    
+    run(input_path, data_dir)
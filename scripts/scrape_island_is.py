@@ -1,26 +1,41 @@
 import re
 import json
 import csv
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin
 from pathlib import Path
 from datetime import datetime
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils import extract_domain
 
 PAGE_URL_is = "https://island.is/s"
 PAGE_URL_en = "https://island.is/en/o"
 BASE_URL = "https://island.is"
 
+# One session for all page requests so the connection to island.is is reused,
+# retrying transient failures with backoff
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=Retry(total=3, backoff_factor=0.5)),
+)
+
+# Next.js page data script, compiled once and matched on the raw page bytes
+NEXT_DATA_PATTERN = re.compile(
+    rb'<script id="__NEXT_DATA__" type="application/json">(.+?)</script>',
+    re.DOTALL,
+)
+
 
 def get_next_data(url: str):
-    html = requests.get(url).text
+    html = SESSION.get(url, timeout=15).content
 
     # Grab the JSON inside <script id="__NEXT_DATA__" ...> ... </script>
-    m = re.search(
-        r'<script id="__NEXT_DATA__" type="application/json">(.+?)</script>',
-        html,
-        re.DOTALL,
-    )
+    # without decoding the whole page first
+    m = NEXT_DATA_PATTERN.search(html)
     if not m:
         raise RuntimeError("__NEXT_DATA__ not found in HTML")
 
@@ -59,30 +74,6 @@ def build_island_url(org):
     return urljoin(BASE_URL, link)
 
 
-def extract_root_domain(url):
-    """
-    Extract the root domain from a URL for DNS lookup.
-    Returns None if URL is None or invalid.
-    """
-    if not url:
-        return None
-    
-    try:
-        parsed = urlparse(url)
-        domain = parsed.netloc or parsed.path
-        
-        # Remove www. prefix if present
-        if domain.startswith("www."):
-            domain = domain[4:]
-        
-        # Remove trailing slashes and paths
-        domain = domain.split('/')[0]
-        
-        return domain if domain else None
-    except Exception:
-        return None
-
-
 def main():
     # Fetch Icelandic data
     print("Fetching Icelandic organizations...")
@@ -100,9 +91,7 @@ def main():
     
   
 
-    # Create lookup dictionary for English names by ID
-    en_lookup = {o.get("id"): o.get("title") for o in orgs_en}
-    # Create lookup dictionary for English tags by ID
+    # Get the tag title of an organization (tags come as a list or a single object)
     def extract_tag(org):
         tag = org.get("tag")
         if isinstance(tag, list) and len(tag) > 0:
@@ -111,21 +100,22 @@ def main():
             return tag.get("title", "")
         return ""
     
-    en_tag_lookup = {o.get("id"): extract_tag(o) for o in orgs_en}
+    # Create lookup dictionary for English names and tags by ID
+    en_by_id = {o.get("id"): (o.get("title"), extract_tag(o)) for o in orgs_en}
 
     # Build combined rows
     rows = []
     for o in orgs_is:
         org_id = o.get("id")
         url = build_island_url(o)
-        domain = extract_root_domain(url)
+        domain = extract_domain(url)
         tag_icelandic = extract_tag(o)
-        tag_english = en_tag_lookup.get(org_id, "")
+        name_english, tag_english = en_by_id.get(org_id, ("", ""))
         
         rows.append(
             {
                 "name_icelandic": o.get("title"),
-                "name_english": en_lookup.get(org_id, ""),
+                "name_english": name_english,
                 "tag_icelandic": tag_icelandic,
                 "tag_english": tag_english,
                 "url": url,
@@ -0,0 +1,35 @@
+"""
+Helpers shared by the pipeline scripts.
+"""
+
+import logging
+from urllib.parse import urlparse
+
+
+def extract_domain(url):
+    """
+    Extract the domain from a URL for DNS lookup.
+    Returns None if URL is None or invalid.
+    """
+    if not url:
+        return None
+    
+    try:
+        parsed = urlparse(url)
+        domain = parsed.netloc or parsed.path
+        
+        # Remove www. prefix if present
+        if domain.startswith("www."):
+            domain = domain[4:]
+        
+        # Remove port number if present
+        if ":" in domain:
+            domain = domain.split(":")[0]
+        
+        # Remove trailing slashes and paths
+        domain = domain.split('/')[0]
+        
+        return domain if domain else None
+    except Exception as e:
+        logging.warning(f"Failed to extract domain from {url}: {e}")
+        return None